@@ -0,0 +1,237 @@
+import asyncio                  # Servidor local sin dependencias externas
+from concurrent.futures import ProcessPoolExecutor  # Cálculo en paralelo
+from decimal import *           # Toma posiciones decimales de string
+from http import HTTPStatus     # Frase de cada código de estado
+import io                       # Pesos por vaca, sólo si se piden
+import json                     # Formato de pedidos y respuestas
+import multiprocessing          # Procesos que no heredan conexiones
+import sys                      # Puerto desde la línea de comandos
+from tp import (Estructura, aleatoria, digitos, empaquetar, simulacion,
+                sucesion)
+
+
+def lote(y: list[int], u: list[float], pedidos: list[dict],
+         /) -> list[dict | None]:
+    """
+    Realiza la simulación de pedidos con igual cantidad de vacas, a
+    partir de la porción de la sucesión que les corresponde: los
+    números se separan en dígitos y se prueban una sola vez.
+    Se ejecuta en un proceso aparte.
+    """
+    x = empaquetar(y, u, digitos(y))
+    veredicto: bool = aleatoria(x)
+    resultados: list[dict | None] = []
+    r: dict | None
+    destino: io.StringIO | None
+    for p in pedidos:
+        destino = io.StringIO() if p["pesos"] else None
+        r = simulacion(p["camiones"], p["sueldo"], p["marcas"], p["vacas"],
+                       p["moda"], p["minimo"], p["maximo"], p["distancia"],
+                       x, destino, veredicto)
+        if r is not None:
+            r["marcas"] = list(r["marcas"].values())
+            r["camiones"] = int(r["camiones"])
+            r["costo"] = str(r["costo"])
+            if destino is not None:
+                r["pesos"] = [float(w) for w in destino.getvalue().split()]
+        resultados.append(r)
+    return resultados
+
+
+def validar(datos: dict, /) -> dict:
+    """
+    Controla los datos de un pedido igual que la ventana y los
+    convierte a los tipos que usa la simulación.
+    Lanza ValueError con el motivo si algún dato es inválido.
+    """
+    p: dict = {}
+    try:
+        p["camiones"] = {int(peso): Decimal(str(precio)).quantize(
+                             Decimal("1.00"))
+                         for peso, precio in datos["camiones"].items()}
+        for clave in ("sueldo", "moda", "minimo", "maximo", "distancia"):
+            p[clave] = Decimal(str(datos[clave]))
+        for clave in ("marcas", "vacas"):
+            p[clave] = int(datos[clave])
+    except (KeyError, AttributeError, TypeError, ValueError,
+            OverflowError, InvalidOperation) as error:
+        raise ValueError("Dato faltante o inválido: " + str(error))
+    if p["camiones"] == {}:
+        raise ValueError("Para calcular la cantidad de camiones, "
+                         + "primero debe cargar al menos un tipo.")
+    # NaN no se puede comparar e infinito no se puede simular
+    for peso, precio in p["camiones"].items():
+        if peso <= 0 or not precio.is_finite() or precio <= 0:
+            raise ValueError("Tipo de camión inválido: " + str(peso))
+    for clave in ("sueldo", "moda", "minimo", "maximo", "distancia"):
+        if not p[clave].is_finite() or p[clave] <= 0:
+            raise ValueError("Valor inválido como " + clave)
+    if p["marcas"] <= 0:
+        raise ValueError("Valor inválido como marcas")
+    if p["vacas"] < 2:  # Con menos, no hay semillas de Von Neumann
+        raise ValueError("Se necesitan al menos 2 vacas")
+    if not p["minimo"] < p["moda"] < p["maximo"]:
+        raise ValueError("Los valores de los pesos de vacas "
+                         + "no tienen sentido, se solapan.")
+    p["generador"] = str(datos.get("generador", "congruencias"))
+    if p["generador"] not in ("congruencias", "halton", "sobol"):
+        raise ValueError("Generador desconocido: " + p["generador"])
+    p["pesos"] = bool(datos.get("pesos", False))
+    return p
+
+
+class Servicio:
+    """
+    Servidor HTTP/JSON local que realiza la simulación sin abrir la
+    ventana. Los pedidos que llegan juntos (dentro de la ventana de
+    espera) con la misma estructura de generación se agrupan: los
+    números se generan una sola vez y cada pedido recibe su porción.
+    Los pedidos de igual cantidad de vacas comparten además las
+    pruebas de aleatoriedad. La generación y cada cantidad distinta
+    se calculan en un grupo de procesos, con una cantidad limitada de
+    cálculos en curso.
+    """
+    espera: float = 0.005   # Segundos que se esperan pedidos similares
+    limite: int = 4         # Cálculos en curso a la vez
+
+    def __init__(self, procesos: int | None = None, /) -> None:
+        # Con fork, los procesos heredarían las conexiones abiertas y
+        # éstas no se cerrarían al responder
+        self.ejecutor = ProcessPoolExecutor(
+            procesos, mp_context=multiprocessing.get_context("spawn"))
+        self.semaforo = asyncio.Semaphore(self.limite)
+        # Pedidos pendientes por clave de estructura
+        self.pendientes: dict[tuple, list[tuple[dict,
+                                                asyncio.Future]]] = {}
+        self.tareas: set[asyncio.Task] = set()  # Evita que se descarten
+
+    async def calcular(self, p: dict, /) -> dict | None:
+        """
+        Agrega el pedido al lote de su estructura y espera su
+        resultado.
+        """
+        cf = Estructura(p["vacas"], p["generador"])
+        # Igual clave implica igual sucesión, sin importar n
+        clave: tuple = (cf.generador, cf.a, cf.c, cf.k, cf.m, cf.x, cf.salto)
+        futuro: asyncio.Future = asyncio.get_running_loop().create_future()
+        if clave not in self.pendientes:
+            self.pendientes[clave] = []
+            tarea = asyncio.create_task(self.despachar(clave))
+            self.tareas.add(tarea)
+            tarea.add_done_callback(self.tareas.discard)
+        self.pendientes[clave].append((p, futuro))
+        return await futuro
+
+    async def ejecutar(self, funcion, /, *args):
+        """
+        Ejecuta la función en el grupo de procesos, respetando el
+        límite de cálculos en curso.
+        """
+        async with self.semaforo:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.ejecutor, funcion, *args)
+
+    async def despachar(self, clave: tuple, /) -> None:
+        """
+        Espera a que lleguen pedidos similares, genera en otro proceso
+        la sucesión para el más grande y calcula en paralelo los
+        pedidos de cada cantidad de vacas con su porción.
+        """
+        await asyncio.sleep(self.espera)
+        grupo = self.pendientes.pop(clave)
+        cf = Estructura(max(p["vacas"] for p, _ in grupo),
+                        grupo[0][0]["generador"])
+        porciones: dict[int, list[tuple[dict, asyncio.Future]]] = {}
+        for p, futuro in grupo:
+            porciones.setdefault(p["vacas"], []).append((p, futuro))
+        try:
+            s = await self.ejecutar(sucesion, cf)
+        except Exception as error:
+            for _, futuro in grupo:
+                futuro.set_exception(error)
+            return
+        if s is None:
+            for _, futuro in grupo:
+                futuro.set_result(None)
+            return
+        await asyncio.gather(*(self.porcion(s[0][:n], s[1][:n], pedidos)
+                               for n, pedidos in porciones.items()))
+
+    async def porcion(self, y: list[int], u: list[float],
+                      grupo: list[tuple[dict, asyncio.Future]], /) -> None:
+        """
+        Calcula en otro proceso los pedidos de igual cantidad de
+        vacas y entrega sus resultados.
+        """
+        try:
+            resultados = await self.ejecutar(lote, y, u,
+                                             [p for p, _ in grupo])
+        except Exception as error:
+            for _, futuro in grupo:
+                futuro.set_exception(error)
+            return
+        for (_, futuro), r in zip(grupo, resultados):
+            futuro.set_result(r)
+
+    async def atender(self, lector: asyncio.StreamReader,
+                      escritor: asyncio.StreamWriter, /) -> None:
+        """
+        Atiende una conexión: un pedido POST /calculo con un cuerpo
+        JSON, respondiendo también en JSON.
+        """
+        estado: int = 200
+        respuesta: dict
+        try:
+            linea: list[str] = (await lector.readline()).decode(
+                "latin-1").split()
+            largo: int = 0
+            while True:
+                cabecera: bytes = await lector.readline()
+                if cabecera in (b"\r\n", b"\n", b""):
+                    break
+                nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                if nombre.strip().lower() == "content-length":
+                    largo = int(valor)
+            if len(linea) < 2 or linea[0] != "POST" \
+                    or linea[1] != "/calculo":
+                estado = 404
+                respuesta = {"error": "Sólo se atiende POST /calculo"}
+            else:
+                p = validar(json.loads(await lector.readexactly(largo)))
+                r = await self.calcular(p)
+                if r is None:
+                    estado = 422
+                    respuesta = {"error": "No se puede generar la cantidad "
+                                 + "de vacas aleatorias deseadas."}
+                else:
+                    respuesta = r
+        except (ValueError, asyncio.IncompleteReadError) as error:
+            estado = 400
+            respuesta = {"error": str(error)}
+        except Exception as error:
+            estado = 500
+            respuesta = {"error": str(error)}
+        cuerpo: bytes = json.dumps(respuesta).encode("utf-8")
+        escritor.write(("HTTP/1.1 " + str(estado) + " "
+                        + HTTPStatus(estado).phrase + "\r\n"
+                        + "Content-Type: application/json\r\n"
+                        + "Content-Length: " + str(len(cuerpo)) + "\r\n"
+                        + "Connection: close\r\n\r\n").encode("latin-1")
+                       + cuerpo)
+        await escritor.drain()
+        escritor.close()
+
+    async def servir(self, puerto: int = 8080, /) -> None:
+        """
+        Escucha únicamente en la máquina local, hasta ser interrumpido.
+        """
+        servidor = await asyncio.start_server(self.atender, "127.0.0.1",
+                                              puerto)
+        with self.ejecutor:
+            async with servidor:
+                await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(Servicio().servir(int(sys.argv[1]) if len(sys.argv) > 1
+                                  else 8080))
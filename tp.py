@@ -1,18 +1,27 @@
+from collections.abc import Iterable, Iterator  # Anotaciones de tipo
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from decimal import *           # Toma posiciones decimales de string
-from functools import partial   # Pasa funciones a widgets
+from functools import lru_cache, partial  # Memoriza y pasa funciones
 from math import erfc, sqrt     # No confundir con cmath
+import numpy as np              # Requiere instalación desde pip
+import os                       # Cantidad de procesadores
 from scipy import stats         # Requiere instalación desde pip
 from tkinter import *           # Requiere instalación desde pip (pytk)
+from tkinter.filedialog import asksaveasfilename  # Archivo de pesos
 from tkinter.messagebox import showinfo  # Mensaje emergente
 # Requiere instalación desde pip (PythonTurtle): sirve para graficar
 from turtle import ScrolledCanvas, RawTurtle, TurtleScreen
+from typing import TextIO       # Anotación del archivo de pesos
+import warnings                 # Silencia advertencias esperadas
 
 
 class Estructura:
     """
     Tipo de dato estructurado que agrupa un conjunto de variables,
     necesario para la generación de números pseudoaleatorios a
-    través del método de Congruencias Fundamental.
+    través del método de Congruencias Fundamental o, según el
+    generador elegido, de números cuasialeatorios (Halton o Sobol);
+    éstos sólo usan n, m, x (como semilla) y salto.
     """
     n: int          # Cantidad de números aleatorios a generar
     a: int = 7      # Semilla factor del último lugar
@@ -20,12 +29,17 @@ class Estructura:
     k: int = 920    # Cantidad de semillas generadas de Von Neumann
     m: int = 99991  # Módulo (actúa también como divisor entero)
     x: int = 1115   # Semilla inicial para los k lugares anteriores
+    # Generador: "congruencias", "halton" o "sobol" (cuasialeatorios)
+    generador: str = "congruencias"
+    salto: int = 0  # Elementos a saltear en cuasialeatorios
 
     # Controlar a alto nivel que n sea mayor a 1
-    def __init__(self, n: int, /) -> None:
+    def __init__(self, n: int, generador: str = "congruencias",
+                 /) -> None:
         if n < 2000:  # En caso que necesite pocos números aleatorios
             self.k = n // 2
         self.n = n
+        self.generador = generador
 
 
 def von_neumann(n: int, z: int, /) -> tuple[int, ...]:
@@ -57,30 +71,104 @@ def von_neumann(n: int, z: int, /) -> tuple[int, ...]:
     return tuple(a)     # Conviene las tuplas por los índices
 
 
-def congruencias_fundamental(
+def von_neumann_lote(n: int, z: np.ndarray,
+                     salida: np.ndarray | None = None,
+                     /) -> np.ndarray | None:
+    """
+    Genera n números pseudoaleatorios con el método de Von Neumann
+    para muchas semillas iniciales a la vez (una por fila), con las
+    mismas correcciones de los 00 que von_neumann.
+    Si se indica salida, debe ser una matriz de enteros de
+    (semillas x n) y se completa en lugar de crear una nueva; cada
+    fila sirve como estado inicial de congruencias_fundamental.
+    Debe controlarse desde afuera que 1000 <= z <= 9999 y que n > 0.
+    En caso de que salida no corresponda, se devuelve None.
+    """
+    x: np.ndarray = np.array(z, dtype=np.int64).ravel()  # Copia
+    if salida is None:
+        salida = np.empty((len(x), n), dtype=np.int64)
+    elif salida.shape != (len(x), n):
+        print("Error: la salida debe ser de", len(x), "x", n, "y no de",
+              " x ".join(str(d) for d in salida.shape) + ".")
+        return None
+    elif not np.issubdtype(salida.dtype, np.integer) \
+            or np.iinfo(salida.dtype).max < 9999:
+        print("Error: la salida debe ser de enteros de 4 dígitos y no de",
+              str(salida.dtype) + ".")
+        return None
+    for i in range(0, n):
+        # Si los primeros dos dígitos son 00, se suma [100;9900]
+        x = np.where(x // 100 == 0, x + (99 - i % 99) * 100, x)
+        # Si los últimos dos dígitos son 00, se suma [1;99]
+        x = np.where(x % 100 == 0, x + (i % 99 + 1), x)
+        x = (x ** 2 % 1000000) // 100   # Los 4 dígitos del medio
+        salida[:, i] = x
+    return salida
+
+
+def digitos(y: list[int], /) -> int:
+    """
+    Cantidad de dígitos con que se separan los números: la del más
+    grande (no la del módulo).
+    """
+    return len(str(max(y)))
+
+
+def empaquetar(y: list[int], u: list[float],
+               p: int, /) -> tuple[tuple[tuple[int, ...], float], ...]:
+    """
+    Arma la tupla de números pseudoaleatorios que utilizan las
+    pruebas y el cálculo: cada elemento posee el conjunto de p dígitos
+    del número entero (completando con ceros a la izquierda) y el
+    número en formato flotante.
+    """
+    e: int
+    f: int
+    w: list[int]
+    z: list[tuple[tuple[int, ...], float]] = []
+    for i in range(len(y)):
+        f = 10 ** p
+        w = []
+        while f > 10:
+            e = y[i] % f
+            e *= 10
+            e //= f
+            w.append(e)
+            f //= 10
+        e = y[i] % 10
+        w.append(e)
+        z.append((tuple(w), u[i]))
+    return tuple(z)     # Conviene las tuplas por los índices
+
+
+def sucesion_congruencias(
     cf: Estructura,
-    /) -> tuple[tuple[tuple[int, ...],
-                      float], ...] | None:
+    semillas: np.ndarray | None = None,
+    /) -> tuple[list[int], list[float]] | None:
     """
     Genera n números pseudoaleatorios con el método de
     Congruencias Fundamental, utilizando una estructura por defecto.
     Debe controlarse desde afuera que n > 0.
-    Devuelve una tupla conteniendo n elementos, cada uno posee
-    una tupla de dos partes; éstas son el conjunto de dígitos
-    del número aleatorio y el número en formato flotante.
+    Las k semillas iniciales se generan con Von Neumann a partir de x,
+    salvo que se indiquen (por ejemplo, una fila de von_neumann_lote).
+    Devuelve la lista de números enteros y la de flotantes, sin
+    separar en dígitos (ver congruencias_fundamental).
     En caso de que exista un error, se devuelve None; por lo tanto,
     debe revisarse posteriormente si la estructura corresponde.
     """
-    p: int = 1  # Cantidad máxima de dígitos
-    v: tuple[int, ...] = von_neumann(cf.k, cf.x)
+    v: tuple[int, ...]
+    if semillas is None:
+        v = von_neumann(cf.k, cf.x)
+    else:
+        v = tuple(np.asarray(semillas).tolist())
+        if len(v) != cf.k:
+            print("Error: se necesitan", cf.k, "semillas iniciales.")
+            return None
     if v[0] >= cf.m:
         print("Error: el elemento 1 de la sucesion es",
               "mayor o igual al modulo.")
         return None
     q: int = (cf.a * v[cf.k-1] + cf.c * v[0]) % cf.m
-    # p se basa en la semilla más grande, no en el módulo
-    while ((10 ** p) <= q):
-        p += 1
     r: float = q / cf.m  # Es lo mismo que q, pero como flotante
     u: list[float] = []
     y: list[int] = []
@@ -92,8 +180,6 @@ def congruencias_fundamental(
                   "de la sucesion es mayor o igual al modulo.")
             return None
         q = (cf.a * y[i-1] + cf.c * v[i]) % cf.m
-        while ((10 ** p) <= q):
-            p += 1
         r = q / cf.m
         u.append(r)
         y.append(q)
@@ -103,34 +189,241 @@ def congruencias_fundamental(
                   " de la sucesion es mayor o igual al modulo.")
             return None
         q = (cf.a * y[i-1] + cf.c * y[i-cf.k]) % cf.m
-        while ((10 ** p) <= q):
-            p += 1
         r = q / cf.m
         u.append(r)
         y.append(q)
-    b: int = 0
-    e: int
-    f: int
-    w: list[int]
-    z: list[tuple[tuple[int, ...], float]] = []
-    for i in range(cf.n):
-        f = 10 ** p
-        w = []
-        while f > 10:
-            e = y[i] % f
-            e *= 10
-            e //= f
-            w.append(e)
-            b += 1
-            f //= 10
-        e = y[i] % 10
-        w.append(e)
-        z.append((tuple(w), u[i]))
-    return tuple(z)     # Conviene las tuplas por los índices
+    return (y, u)
 
 
-def monobits(x: tuple[tuple[tuple[int, ...],
-                            float], ...], /) -> bool:
+def congruencias_fundamental(
+    cf: Estructura,
+    semillas: np.ndarray | None = None,
+    /) -> tuple[tuple[tuple[int, ...],
+                      float], ...] | None:
+    """
+    Genera n números pseudoaleatorios con el método de
+    Congruencias Fundamental (ver sucesion_congruencias).
+    Devuelve una tupla conteniendo n elementos, cada uno posee
+    una tupla de dos partes; éstas son el conjunto de dígitos
+    del número aleatorio y el número en formato flotante.
+    En caso de que exista un error, se devuelve None.
+    """
+    s = sucesion_congruencias(cf, semillas)
+    if s is None:
+        return None
+    return empaquetar(s[0], s[1], digitos(s[0]))
+
+
+def mult_mod(a: np.ndarray, b: np.ndarray, m: int, /) -> np.ndarray:
+    """
+    Multiplica a por b módulo m, elemento a elemento, sobre enteros
+    de 64 bits sin signo y sin desbordarse, para módulos de hasta
+    2^61-1 (a y b se reducen antes módulo m).
+    Si m < 2^32, el producto entra en 64 bits. Si m es el primo de
+    Mersenne 2^61-1, se multiplica por mitades de 32 bits y se reduce
+    con 2^61 = 1 (mod m). Para otro módulo, se multiplica de a 3 bits
+    de b (como en la multiplicación por duplicación), reduciendo en
+    cada paso.
+    """
+    M: np.uint64 = np.uint64(m)
+    a = np.asarray(a, dtype=np.uint64) % M
+    b = np.asarray(b, dtype=np.uint64) % M
+    if m < 2 ** 32:
+        return a * b % M
+    if m == 2 ** 61 - 1:
+        B32: np.uint64 = np.uint64(0xFFFFFFFF)      # Mitad inferior
+        B29: np.uint64 = np.uint64(0x1FFFFFFF)
+        ah: np.ndarray = a >> np.uint64(32)         # Menor a 2^29
+        al: np.ndarray = a & B32
+        bh: np.ndarray = b >> np.uint64(32)
+        bl: np.ndarray = b & B32
+        medio: np.ndarray = ah * bl + al * bh       # Menor a 2^62
+        bajo: np.ndarray = al * bl                  # Menor a 2^64
+        # a*b = ah*bh*2^64 + medio*2^32 + bajo; con 2^64 = 8 y
+        # medio*2^32 = (medio >> 29)*2^61 + (medio & B29)*2^32
+        r: np.ndarray = ((bajo & M) + (bajo >> np.uint64(61))
+                         + ((ah * bh) << np.uint64(3))
+                         + (medio >> np.uint64(29))
+                         + ((medio & B29) << np.uint64(32)))
+        r = (r & M) + (r >> np.uint64(61))  # Cada término es < 2^61
+        return np.where(r >= M, r - M, r)
+    r = np.zeros(np.broadcast(a, b).shape, dtype=np.uint64)
+    for i in range(60, -1, -3):     # Grupos de 3 bits, desde arriba
+        r = (r << np.uint64(3)) % M
+        r = (r + a * ((b >> np.uint64(i)) & np.uint64(7)) % M) % M
+    return r
+
+
+def congruencias_lote(semillas: np.ndarray, n: int, a: int, c: int,
+                      m: int, /) -> np.ndarray | None:
+    """
+    Aplica la recurrencia de Congruencias Fundamental a muchas
+    sucesiones a la vez: cada fila de semillas (por ejemplo, de
+    von_neumann_lote) es el estado inicial de k lugares de una.
+    Opera con enteros de 64 bits mediante mult_mod, por lo que admite
+    módulos de hasta 2^61-1; el resultado coincide con el de
+    congruencias_fundamental, que usa enteros de Python.
+    Devuelve una matriz de (sucesiones x n) con los números enteros;
+    los flotantes se obtienen dividiendo por m.
+    En caso de que exista un error, se devuelve None.
+    """
+    if m <= 0 or m >= 2 ** 61:
+        print("Error: el modulo debe ser positivo y menor a 2^61.")
+        return None
+    v: np.ndarray = np.asarray(semillas, dtype=np.uint64)
+    if v.ndim == 1:
+        v = v[None, :]
+    k: int = v.shape[1]
+    if k == 0:
+        print("Error: las filas de semillas estan vacias.")
+        return None
+    if (v >= np.uint64(m)).any():
+        print("Error: hay semillas mayores o iguales al modulo.")
+        return None
+    M: np.uint64 = np.uint64(m)
+    y: np.ndarray = np.empty((v.shape[0], n), dtype=np.uint64)
+    y[:, 0] = (mult_mod(v[:, k-1], a, m) + mult_mod(v[:, 0], c, m)) % M
+    for i in range(1, n):
+        # Los primeros k lugares anteriores son las semillas
+        y[:, i] = (mult_mod(y[:, i-1], a, m)
+                   + mult_mod(v[:, i] if i < k else y[:, i-k], c, m)) % M
+    return y
+
+
+def verificar_lote(cantidad: int, n: int, k: int, a: int, c: int, m: int,
+                   semilla: int = 0, /) -> bool:
+    """
+    Comprueba de forma reproducible que congruencias_lote coincida con
+    congruencias_fundamental: genera cantidad filas de k semillas al
+    azar (a partir de la semilla indicada) y compara cada sucesión
+    de n números, en el formato de congruencias_fundamental. También
+    compara mult_mod con la multiplicación de enteros de Python.
+    Debe controlarse desde afuera que 0 < k <= n.
+    Informa la primera diferencia encontrada.
+    """
+    g: np.random.Generator = np.random.default_rng(semilla)
+    v: np.ndarray = g.integers(0, m, (cantidad, k), dtype=np.uint64)
+    y: np.ndarray | None = congruencias_lote(v, n, a, c, m)
+    if y is None:
+        return False
+    cf = Estructura(n)
+    cf.k, cf.a, cf.c, cf.m = k, a, c, m
+    fila: list[int]
+    for i in range(cantidad):
+        fila = y[i].tolist()
+        if empaquetar(fila, [q / m for q in fila], digitos(fila)) \
+                != congruencias_fundamental(cf, v[i]):
+            print("Error: la sucesion", i, "no coincide")
+            return False
+    b: np.ndarray = g.integers(0, m, len(v.ravel()), dtype=np.uint64)
+    r: list[int] = mult_mod(v.ravel(), b, m).tolist()
+    for i in range(len(r)):
+        if r[i] != int(v.flat[i]) * int(b[i]) % m:
+            print("Error: mult_mod difiere en el elemento", i)
+            return False
+    return True
+
+
+def sucesion_cuasialeatoria(
+    cf: Estructura,
+    /) -> tuple[list[int], list[float]] | None:
+    """
+    Genera n números cuasialeatorios (de baja discrepancia) con las
+    sucesiones de Halton o Sobol, según el generador de la estructura.
+    Se aleatorizan (scrambling) usando x como semilla y se saltean los
+    primeros elementos indicados en salto; así, cada proceso puede
+    tomar su propio tramo de la misma sucesión.
+    Devuelve las listas de enteros y de flotantes, igual que
+    sucesion_congruencias; los enteros son la parte entera del número
+    por el módulo.
+    En caso de que exista un error, se devuelve None.
+    """
+    motor: stats.qmc.QMCEngine
+    if cf.generador == "halton":
+        motor = stats.qmc.Halton(d=1, scramble=True, seed=cf.x)
+    elif cf.generador == "sobol":
+        motor = stats.qmc.Sobol(d=1, scramble=True, seed=cf.x)
+    else:
+        print("Error: el generador", cf.generador, "no es cuasialeatorio.")
+        return None
+    if cf.salto > 0:
+        motor.fast_forward(cf.salto)
+    with warnings.catch_warnings():
+        # Sobol advierte si n no es potencia de 2; no afecta al uso
+        warnings.simplefilter("ignore", UserWarning)
+        u: np.ndarray = motor.random(cf.n).ravel()
+    y: np.ndarray = (u * cf.m).astype(np.int64)
+    return (y.tolist(), u.tolist())
+
+
+def cuasialeatorios(
+    cf: Estructura,
+    /) -> tuple[tuple[tuple[int, ...],
+                      float], ...] | None:
+    """
+    Genera n números cuasialeatorios (ver sucesion_cuasialeatoria),
+    con el mismo formato que Congruencias Fundamental.
+    En caso de que exista un error, se devuelve None.
+    """
+    s = sucesion_cuasialeatoria(cf)
+    if s is None:
+        return None
+    return empaquetar(s[0], s[1], digitos(s[0]))
+
+
+def sucesion(
+    cf: Estructura,
+    /) -> tuple[list[int], list[float]] | None:
+    """
+    Genera n números con el generador elegido en la estructura,
+    devolviendo las listas de enteros y de flotantes. Como la
+    sucesión no depende de n, sus primeros elementos coinciden con
+    los de generar menos números con la misma estructura (si k
+    también coincide).
+    En caso de que exista un error, se devuelve None.
+    """
+    if cf.generador == "congruencias":
+        return sucesion_congruencias(cf)
+    elif cf.generador in ("halton", "sobol"):
+        return sucesion_cuasialeatoria(cf)
+    print("Error: el generador", cf.generador, "es desconocido.")
+    return None
+
+
+def generar(
+    cf: Estructura,
+    /) -> tuple[tuple[tuple[int, ...],
+                      float], ...] | None:
+    """
+    Genera n números con el generador elegido en la estructura,
+    devolviendo siempre el mismo formato.
+    En caso de que exista un error, se devuelve None.
+    """
+    s = sucesion(cf)
+    if s is None:
+        return None
+    return empaquetar(s[0], s[1], digitos(s[0]))
+
+
+def pvalor_binomial(s: int, N: int, v: float, /) -> float:
+    """
+    Valor p exacto y aleatorizado de |S|, donde S = 2K - N es la
+    diferencia entre mitades y K sigue una binomial(N, 1/2).
+    Como S es discreto, la probabilidad de igualar el valor observado
+    se reparte según v (uniforme en [0;1)); así el valor p es
+    uniforme si los números son aleatorios.
+    """
+    k: int = (N + abs(s)) // 2      # Valor de K en la cola superior
+    # Si S = 0 sólo hay una forma de igualarlo; sino, hay dos (+S, -S)
+    formas: int = 1 if s == 0 else 2
+    return float(min(1.0, 2 * stats.binom.sf(k, N, 0.5)
+                     + v * formas * stats.binom.pmf(k, N, 0.5)))
+
+
+def monobits_p(x: tuple[tuple[tuple[int, ...],
+                              float], ...],
+               v: tuple[float, float] | None = None,
+               /) -> tuple[float, float]:
     """
     Prueba que los dígitos obtenidos y los números flotantes
     se distribuyen aleatoriamente (equitativamente).
@@ -140,8 +433,11 @@ def monobits(x: tuple[tuple[tuple[int, ...],
     basado en una distribución normal.
     Para los dígitos, se utilizan los grupos [0;4] y [5;9].
     Para los flotantes, se utilizan los grupos [0.0;0.5) y [0.5;1.0).
+    Devuelve los valores p de los flotantes y de los dígitos.
+    Si se indican dos uniformes v, los valores p son los exactos
+    aleatorizados (ver pvalor_binomial), como requiere la prueba de
+    segundo nivel; sino, los de la aproximación normal.
     """
-    ALFA = Decimal('0.01')      # Es más preciso que flotante
     L = len(x)                  # Cantidad de números flotantes
     D = len(x[0][0])            # Proporción de dígitos por flotante
     u: int = 0                  # Contador de dígitos
@@ -159,20 +455,32 @@ def monobits(x: tuple[tuple[tuple[int, ...],
     complementaria, S es la diferencia encontrada de elementos (se
     halla dentro de una función de absoluto); sqrt() es una raíz
     cuadrada y N es la cantidad de números pseudoaleatorios.
-    Por último, se prueba si los estadísticos Z son mayores o iguales
-    al nivel de tolerancia alfa; ajustado a 0.01.
+    Por último, se devuelven los valores p obtenidos.
     '''
     for i in x:
         for n in i[0]:
             u = u+1 if (n >= 5) else u-1
         f = f+1 if (i[1] >= 0.5) else f-1
+    if v is not None:
+        return (pvalor_binomial(f, L, v[0]),
+                pvalor_binomial(u, L * D, v[1]))
     m: float = (f ** 2) / (L * 2)
     b: float = (u ** 2) / (L * D * 2)
-    return (erfc(sqrt(m)) >= ALFA and erfc(sqrt(b)) >= ALFA)
+    return (erfc(sqrt(m)), erfc(sqrt(b)))
 
 
-def chi_cuadrado(x: tuple[tuple[tuple[int, ...],
-                                float], ...], /) -> bool:
+def monobits(x: tuple[tuple[tuple[int, ...],
+                            float], ...], /) -> bool:
+    """
+    Prueba monobits: los valores p de los dígitos y de los flotantes
+    deben ser mayores o iguales al nivel de tolerancia alfa.
+    """
+    ALFA = Decimal('0.01')      # Es más preciso que flotante
+    return (min(monobits_p(x)) >= ALFA)
+
+
+def chi_cuadrado_p(x: tuple[tuple[tuple[int, ...],
+                                  float], ...], /) -> tuple[float, float]:
     """
     Prueba que los dígitos obtenidos y los números flotantes
     se distribuyen aleatoriamente (equitativamente).
@@ -184,8 +492,8 @@ def chi_cuadrado(x: tuple[tuple[tuple[int, ...],
     Para los flotantes, se fragmenta en porciones de 0.1; donde
     se incluye el valor inferior y se excluye el valor superior,
     por ejemplo: [0.0;0.1).
+    Devuelve los valores p de los dígitos y de los flotantes.
     """
-    C = 14.6837         # alfa = 0.1 con gl = 9
     L = len(x)          # Cantidad de números flotantes
     D = len(x[0][0])    # Proporción de dígitos por flotante
     x: int              # Auxiliar para fragmentador de flotantes
@@ -198,10 +506,9 @@ def chi_cuadrado(x: tuple[tuple[tuple[int, ...],
     Tras obtener las cantidades contadas, se suma los cuadrados de
     las diferencias entre lo esperado y lo observiado; dividido por lo
     esperado, optimizando lo último al realizar tal operación al final.
-    Por último, se prueba si los estadísticos no superan el máximo
-    permitido por el nivel de tolerancia alfa; ajustado a 0.01, en
-    conjunto con los 9 grados de libertad (10-1 porque la probabilidad
-    de todo sumado es igual a 1).
+    Por último, se obtiene la probabilidad de superar los estadísticos
+    con 9 grados de libertad (10-1 porque la probabilidad de todo
+    sumado es igual a 1).
     '''
     for i in x:
         for n in i[0]:
@@ -217,7 +524,134 @@ def chi_cuadrado(x: tuple[tuple[tuple[int, ...],
     cf /= L
     ce *= 10
     cf *= 10
-    return (ce < C and cf < C)
+    return (float(stats.chi2.sf(ce, 9)), float(stats.chi2.sf(cf, 9)))
+
+
+def chi_cuadrado(x: tuple[tuple[tuple[int, ...],
+                                float], ...], /) -> bool:
+    """
+    Prueba de chi cuadrado: los estadísticos de los dígitos y de los
+    flotantes no deben superar el máximo permitido por el nivel de
+    tolerancia alfa, con 9 grados de libertad.
+    """
+    ALFA = 0.1          # Equivale a C = 14.6837 con gl = 9
+    return (min(chi_cuadrado_p(x)) > ALFA)
+
+
+@lru_cache(maxsize=None)
+def probabilidades_poker(p: int, /) -> tuple[float, ...]:
+    """
+    Calcula, para manos de p dígitos decimales, la probabilidad de que
+    una mano tenga exactamente r dígitos distintos (r = 1, 2, ...).
+    Se basa en los números de Stirling de segunda especie S(p, r),
+    que cuentan las formas de agrupar las p posiciones en r grupos;
+    luego se elige qué dígito ocupa cada grupo:
+    P(r) = S(p, r) * 10! / (10-r)! / 10^p
+    La tabla se guarda por cada p.
+    """
+    R: int = min(p, 10)     # No hay más de 10 dígitos distintos
+    s: list[int] = [1] + [0] * R    # S(0, r): fila inicial
+    for i in range(1, p + 1):
+        # S(i, r) = r * S(i-1, r) + S(i-1, r-1), de derecha a izquierda
+        for r in range(min(i, R), 0, -1):
+            s[r] = r * s[r] + s[r-1]
+        s[0] = 0
+    probabilidades: list[float] = []
+    v: int = 1              # Variaciones de 10 dígitos tomados de a r
+    for r in range(1, R + 1):
+        v *= 10 - r + 1
+        probabilidades.append(s[r] * v / 10 ** p)
+    return tuple(probabilidades)
+
+
+def digitos_mano(p: int, /) -> int:
+    """
+    Cantidad de dígitos de cada mano de póker para números de p
+    dígitos: sólo los p-2 de menor orden (al menos uno). Los números
+    son menores que el módulo m, con m >= 10^(p-1); el primer dígito
+    está sesgado (por ejemplo, para m = 2^31-1 sólo vale 0, 1 o 2) y
+    también el segundo si m/10^(p-1) es chico, mientras que cada
+    valor de los p-2 restantes se alcanza desde al menos 10 números,
+    por lo que son uniformes salvo un error de menos de 1/10 en el
+    primero de ellos.
+    """
+    return max(1, p - 2)
+
+
+@lru_cache(maxsize=None)
+def tabla_poker(p: int, alfa: float,
+                /) -> tuple[tuple[float, ...], tuple[float, ...]]:
+    """
+    Devuelve las probabilidades de las manos de p dígitos y los
+    valores críticos de chi cuadrado para el nivel alfa, con grados
+    de libertad desde 1 hasta la cantidad de categorías menos uno.
+    Las tablas se guardan por cada par (p, alfa).
+    """
+    probabilidades: tuple[float, ...] = probabilidades_poker(p)
+    criticos: tuple[float, ...] = tuple(
+        float(stats.chi2.ppf(1 - alfa, gl))
+        for gl in range(1, len(probabilidades)))
+    return (probabilidades, criticos)
+
+
+def estadistico_poker(x: tuple[tuple[tuple[int, ...],
+                                     float], ...],
+                      /) -> tuple[float, int]:
+    """Agrupa los números como manos de póker y calcula el estadístico
+    chi cuadrado entre las manos observadas y las esperadas.
+    Las manos se clasifican por la cantidad de dígitos distintos,
+    lo que permite usar cualquier cantidad de dígitos por número;
+    cada mano toma sólo los dígitos uniformes (ver digitos_mano).
+    Devuelve el estadístico y sus grados de libertad; éstos son 0 si
+    no hay suficientes manos para comparar.
+    """
+    L = len(x)          # Cantidad de manos
+    D = len(x[0][0])    # Cantidad de dígitos por número
+    P = digitos_mano(D)  # Cantidad de dígitos por mano
+    probabilidades: tuple[float, ...] = probabilidades_poker(P)
+    o: list[int] = [0] * len(probabilidades)    # Observado
+    for i in x:
+        o[len(set(i[0][D-P:]))-1] += 1
+    e: list[float] = [q * L for q in probabilidades]  # Esperado
+    '''Mientras la frecuencia esperada de un extremo sea menor de 5,
+    se agrupa con la categoría contigua. Si al final queda un único
+    grupo, se considera que no pasa la prueba, a causa de no ser lo
+    suficientemente contundente.
+    '''
+    w: float        # Variable auxiliar para guardar temporalmente
+    while len(e) > 1 and e[0] < 5:      # Pocos dígitos distintos
+        w = e.pop(0)
+        e[0] += w
+        o[1] += o[0]
+        o.pop(0)
+    while len(e) > 1 and e[-1] < 5:     # Muchos dígitos distintos
+        w = e.pop()
+        e[-1] += w
+        o[-2] += o[-1]
+        o.pop()
+    if len(e) < 2 or e[0] < 5:
+        return (0.0, 0)
+    z: float = 0.0
+    '''En el bucle, se suma el cuadrado de la diferencia entre
+    lo observado y lo esperado; dividiéndose por lo esperado.
+    Los grados de libertad son iguales a la cantidad de categorías
+    menos uno (la suma de probabilidades es 1).
+    '''
+    for i in range(len(e)):
+        z += ((o[i] - e[i]) ** 2) / e[i]
+    return (z, len(e)-1)
+
+
+def poker_p(x: tuple[tuple[tuple[int, ...],
+                           float], ...], /) -> float:
+    """
+    Devuelve el valor p de la prueba de póker; es 0 si no hay
+    suficientes manos para comparar.
+    """
+    z: float
+    gl: int
+    z, gl = estadistico_poker(x)
+    return float(stats.chi2.sf(z, gl)) if gl > 0 else 0.0
 
 
 def poker(x: tuple[tuple[tuple[int, ...],
@@ -230,134 +664,30 @@ def poker(x: tuple[tuple[tuple[int, ...],
     Determina si los números cumplen con las propiedades de
     uniformidad e independencia.
     """
-    L = len(x)          # Se utiliza como constante por repitencia
-    UNI = [1, 1, 1, 1]  # Todas diferentes
-    PAR = [2, 1, 1, 1]  # Un par (resto diferentes)
-    DUP = [2, 2, 1, 1]  # Dos pares (el restante único)
-    TER = [3, 2, 1, 1]  # Una tercia (resto diferentes)
-    FUL = [3, 2, 2, 1]  # Full house (tercia y par)
-    CUA = [4, 3, 2, 1]  # Póker (4 iguales)
-    QUI = [5, 4, 3, 2]  # Quintilla (todas iguales)
-    v: list[int]        # Cantidad de repeticiones de elemento
-    y: dict[Decimal, int] = {}  # Diccionario de esperado vs observado
-    cu: Decimal = Decimal("0.3024")*L   # Todas diferentes
-    cp: Decimal = Decimal("0.504")*L    # Un par (resto diferentes)
-    cd: Decimal = Decimal("0.108")*L    # Dos pares (el restante único)
-    ct: Decimal = Decimal("0.072")*L    # Una tercia (resto diferentes)
-    cf: Decimal = Decimal("0.009")*L    # Full house (tercia y par)
-    cc: Decimal = Decimal("0.0045")*L   # Póker (4 iguales)
-    cq: Decimal = Decimal("0.0001")*L   # Quintilla (todas iguales)
-    y[cu] = 0   # Todas diferentes
-    y[cp] = 0   # Un par (resto diferentes)
-    y[cd] = 0   # Dos pares (el restante único)
-    y[ct] = 0   # Una tercia (resto diferentes)
-    y[cf] = 0   # Full house (tercia y par)
-    y[cc] = 0   # Póker (4 iguales)
-    y[cq] = 0   # Quintilla (todas iguales)
-    for i in x:
-        v = []                      # Debe limpiarse en cada iteración
-        for n in range(len(i[0])-1):  # El último siempre será 1(uno)
-            v.append(i[0][n:len(i[0])].count(i[0][n]))
-        v = sorted(v, reverse=True)  # Necesario para comparar
-        ''' En este bloque condicional, se cuenta cada mano de
-        póker según el patrón que sigue. Se ha ordenado priorizando
-        a los que tengan mayor probabilidad, esperando mayor
-        frecuencia de éstos; mientras que los menos recurrentes
-        se consultan más abajo.
-        '''
-        if v == PAR:        # Un par (resto diferentes)
-            y[cp] = y[cp]+1
-        elif v == UNI:      # Todas diferentes
-            y[cu] = y[cu]+1
-        elif v == DUP:      # Dos pares (el restante único)
-            y[cd] = y[cd]+1
-        elif v == TER:      # Una tercia (resto diferentes)
-            y[ct] = y[ct]+1
-        elif v == FUL:      # Full house (tercia y par)
-            y[cf] = y[cf]+1
-        elif v == CUA:      # Póker (4 iguales)
-            y[cc] = y[cc]+1
-        elif v == QUI:      # Quintilla (todas iguales)
-            y[cq] = y[cq]+1
-        else:  # Si no entra en ninguna categoría
-            return False  # Tiene que ser un error
-    w: Decimal      # Variable auxiliar para guardar temporalmente
-    '''Mientras la frecuencia esperada sea menor de 5, se agrupa
-    la fila inferior con la inmediata superior hasta que la suma
-    sea al menos 5. Si al quedar sólo dos grupos, sigue siendo
-    menor a 5; se considera que no pasa la prueba, a causa de
-    no ser lo suficientemente contundente.
-    '''
-    if cq < 5:
-        w = Decimal("0.0046")*L
-        y[w] = y[cc] + y[cq]
-        y.pop(cq)
-        y.pop(cc)
-        cc = w
-        if cc < 5:
-            w = Decimal("0.0136")*L
-            y[w] = y[cf] + y[cc]
-            y.pop(cc)
-            y.pop(cf)
-            cf = w
-            if cf < 5:
-                w = Decimal("0.0856")*L
-                y[w] = y[ct] + y[cf]
-                y.pop(cf)
-                y.pop(ct)
-                ct = w
-                if ct < 5:
-                    w = Decimal("0.1936")*L
-                    y[w] = y[cd] + y[ct]
-                    y.pop(ct)
-                    y.pop(cd)
-                    cd = w
-                    if cd < 5:
-                        w = Decimal("0.496")*L
-                        y[w] = y[cu] + y[cd]
-                        y.pop(cd)
-                        y.pop(cu)
-                        cu = w
-                        if cu < 5:
-                            return False  # No hay más de 10 elementos
-    z: Decimal = Decimal(0)
-    '''En el bucle, se suma el cuadrado de la diferencia entre
-    lo observado y lo esperado; dividiéndose por lo esperado
-    '''
-    for w in y.items():
-        z += (((Decimal(w[1])) - w[0]) ** 2) / w[0]
-    '''Según la cantidad de categorías, se comprueba el estadístico;
-    para alfa=0.1 y grados de libertad iguales a la cantidad de
-    categorías menos uno (la suma de probabilidades de todas las
-    categorías es 1).
-    '''
-    T = len(y)
-    if T == 7:
-        return (z < 10.6446)    # alfa = 0.1 con gl = 6
-    elif T == 6:
-        return (z < 9.2363)     # alfa = 0.1 con gl = 5
-    elif T == 5:
-        return (z < 7.7794)     # alfa = 0.1 con gl = 4
-    elif T == 4:
-        return (z < 6.2514)     # alfa = 0.1 con gl = 3
-    elif T == 3:
-        return (z < 4.6052)     # alfa = 0.1 con gl = 2
-    elif T == 2:
-        return (z < 2.7055)     # alfa = 0.1 con gl = 1
-    else:                       # Para llegar hasta aquí
-        return False            # Debe ser un error
+    ALFA = 0.1
+    z: float
+    gl: int
+    z, gl = estadistico_poker(x)
+    if gl == 0:         # No hay más de un grupo
+        return False
+    return (z < tabla_poker(digitos_mano(len(x[0][0])), ALFA)[1][gl-1])
 
 
-def rachas(x: tuple[tuple[tuple[int, ...],
-                          float], ...], /) -> bool:
+def rachas_p(x: tuple[tuple[tuple[int, ...],
+                            float], ...], v: float | None = None,
+             /) -> float:
     """
     Prueba si los números flotantes siguen algún patrón para hallarse
     por debajo o arriba de la media. Utiliza la distribución normal
     para realizar esta comparación, basándose en el siguiente
     programa:
     https://www.geeksforgeeks.org/runs-test-of-randomness-in-python/
+    Como el recorrido es circular, la media y la varianza de la
+    cantidad de cambios son las exactas para una disposición circular.
+    Devuelve el valor p (de dos colas). Si se indica un uniforme v,
+    se aleatoriza: la cantidad de cambios siempre es par, y se reparte
+    uniformemente entre el valor observado y el siguiente posible.
     """
-    ALFA = Decimal('0.01')
     mediana: float = 0.5
     observado: int = 0      # Cuenta cada racha (cambio)
     pos: int = 0            # El contador no descontará
@@ -376,11 +706,557 @@ def rachas(x: tuple[tuple[tuple[int, ...],
             pos += 1
         else:
             neg += 1
-    esperado: float = ((2*pos*neg)/(pos+neg))+1
-    desvio_estandar: float = sqrt((2*pos*neg*(2*pos*neg-pos-neg)) /
-                                  (((pos+neg)**2)*(pos+neg-1)))
-    z: float = (observado-esperado)/desvio_estandar
-    return (stats.norm.cdf(-abs(z)) >= ALFA)
+    N: int = pos + neg
+    if pos == 0 or neg == 0 or N < 4:   # Una única racha
+        return 0.0
+    # Cada uno de los N pares vecinos cambia con probabilidad q; dos
+    # pares que comparten un número cambian a la vez con probabilidad
+    # r1 (hay 2N de estos pares ordenados) y dos pares disjuntos, con
+    # probabilidad r2 (hay N(N-3))
+    q: float = 2*pos*neg / (N*(N-1))
+    r1: float = pos*neg / (N*(N-1))
+    r2: float = 4*pos*neg*(pos-1)*(neg-1) / (N*(N-1)*(N-2)*(N-3))
+    esperado: float = N*q
+    varianza: float = N*q + 2*N*r1 + N*(N-3)*r2 - esperado**2
+    if v is not None:   # Uniforme en [observado-1;observado+1)
+        observado += 2*v - 1
+        varianza += 1/3
+    z: float = (observado-esperado)/sqrt(varianza)
+    return float(2 * stats.norm.cdf(-abs(z)))
+
+
+def rachas(x: tuple[tuple[tuple[int, ...],
+                          float], ...], /) -> bool:
+    """
+    Prueba de rachas: cada cola de la distribución normal debe tener
+    una probabilidad mayor o igual al nivel de tolerancia alfa.
+    """
+    ALFA = Decimal('0.01')
+    return (rachas_p(x) / 2 >= ALFA)
+
+
+# Nombres de los valores p que devuelve bateria_p, en orden
+PRUEBAS: tuple[str, ...] = ("monobits (flotantes)", "monobits (dígitos)",
+                            "chi cuadrado (dígitos)",
+                            "chi cuadrado (flotantes)", "póker", "rachas")
+
+
+def bateria_p(cf: Estructura, semilla: int, /) -> tuple[float, ...] | None:
+    """
+    Genera los números de la estructura y devuelve los valores p de
+    todas las pruebas, en el orden de PRUEBAS.
+    Las pruebas de estadístico discreto (monobits y rachas) usan
+    valores p aleatorizados, con uniformes de un generador de NumPy
+    independiente del probado (iniciado con la semilla indicada).
+    En caso de que exista un error al generar, se devuelve None.
+    """
+    x = generar(cf)
+    if x is None:
+        return None
+    v: np.ndarray = np.random.default_rng(semilla).random(3)
+    return (monobits_p(x, (v[0], v[1])) + chi_cuadrado_p(x)
+            + (poker_p(x), rachas_p(x, v[2])))
+
+
+def variantes(n: int, cantidad: int, generador: str = "congruencias",
+              /) -> Iterator[Estructura]:
+    """
+    Produce, de a una, estructuras de n números que sólo difieren en
+    su semilla: para Congruencias Fundamental se recorre la semilla
+    de Von Neumann en [1000;9999]; para los cuasialeatorios, cada una
+    toma el tramo siguiente de la misma sucesión.
+    Lanza ValueError si se piden más estructuras que semillas
+    distintas (9000), ya que repetirlas invalidaría la prueba.
+    """
+    if generador == "congruencias" and cantidad > 9000:
+        raise ValueError("Sólo hay 9000 semillas de Von Neumann distintas")
+    cf: Estructura
+    for i in range(cantidad):
+        cf = Estructura(n, generador)
+        if generador == "congruencias":
+            cf.x = 1000 + i
+        else:
+            cf.salto = i * n
+        yield cf
+
+
+def segundo_nivel(estructuras: Iterable[Estructura],
+                  procesos: int | None = None, contenedores: int = 1000,
+                  /) -> dict[str, tuple[int, float, float]]:
+    """
+    Prueba de segundo nivel: ejecuta la batería de pruebas sobre
+    muchas estructuras (semillas o tramos) en paralelo y comprueba
+    que los valores p de cada prueba se distribuyan uniformemente,
+    con la prueba de Kolmogorov-Smirnov. Para que lo sean con un
+    generador perfecto, las pruebas de estadístico discreto usan
+    valores p aleatorizados (ver bateria_p); chi cuadrado y póker
+    tienen estadísticos con muchos valores posibles y se tratan como
+    continuos.
+    Los valores p no se guardan: se acumulan en un histograma de
+    tantos contenedores como se indique, por lo que la memoria no
+    depende de la cantidad de estructuras; el estadístico D se
+    calcula en los bordes de los contenedores (error de a lo sumo
+    1/contenedores). Tampoco se encolan más de dos estructuras por
+    proceso.
+    Devuelve, por cada prueba, la cantidad de valores p, el
+    estadístico D y su valor p.
+    """
+    h: np.ndarray = np.zeros((len(PRUEBAS), contenedores), dtype=np.int64)
+    limite: int = 2 * (procesos or os.cpu_count() or 1)
+    pendientes: set = set()
+    listos: set
+
+    def acumular(terminados: set, /) -> None:
+        for futuro in terminados:
+            p: tuple[float, ...] | None = futuro.result()
+            if p is None:   # El error ya fue informado al generar
+                continue
+            for i in range(len(p)):
+                h[i, min(int(p[i] * contenedores), contenedores - 1)] += 1
+
+    with ProcessPoolExecutor(procesos) as ejecutor:
+        for i, cf in enumerate(estructuras):
+            if len(pendientes) >= limite:
+                listos, pendientes = wait(pendientes,
+                                          return_when=FIRST_COMPLETED)
+                acumular(listos)
+            pendientes.add(ejecutor.submit(bateria_p, cf, i))
+        acumular(wait(pendientes)[0])
+    bordes: np.ndarray = np.arange(1, contenedores + 1) / contenedores
+    resultado: dict[str, tuple[int, float, float]] = {}
+    N: int
+    d: float
+    for i in range(len(PRUEBAS)):
+        N = int(h[i].sum())
+        if N == 0:
+            resultado[PRUEBAS[i]] = (0, 1.0, 0.0)
+            continue
+        d = float(np.abs(np.cumsum(h[i]) / N - bordes).max())
+        resultado[PRUEBAS[i]] = (N, d, float(stats.kstwo.sf(d, N)))
+    return resultado
+
+
+def grilla_escenarios(*ejes: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Combina todos los valores de cada eje (por ejemplo: pesos totales,
+    distancias y sueldos) en un producto cartesiano, devolviendo un
+    vector plano por eje; todos de la misma longitud (escenarios).
+    """
+    mallas = np.meshgrid(*(np.asarray(e) for e in ejes), indexing="ij")
+    return tuple(malla.ravel() for malla in mallas)
+
+
+def costos_camiones(camiones: dict[int, Decimal], totales: np.ndarray,
+                    distancias: np.ndarray, sueldos: np.ndarray,
+                    precios: np.ndarray | None = None,
+                    moda: Decimal = Decimal(0),
+                    /) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evalúa el costo de transporte de todo el catálogo de camiones
+    para muchos escenarios a la vez, igual que en el cálculo
+    individual: cantidad * (precio * distancia + sueldo).
+    Los totales (kg), distancias (km) y sueldos ($) son vectores con
+    un valor por escenario (o escalares). Los precios son opcionales:
+    si se indican, es una matriz de escenarios por tipo de camión
+    (en el orden del diccionario) que reemplaza al precio del catálogo.
+    Se opera en centavos enteros en lugar de Decimal; la distancia se
+    lleva a metros y cada tramo se redondea al centavo.
+    Devuelve, por escenario, la capacidad del camión ideal, la
+    cantidad de camiones y el costo en centavos. Ante empate, se
+    conserva el primer tipo del catálogo (como en el cálculo original).
+    """
+    BLOQUE = 65536      # Escenarios por bloque (acota la memoria)
+    capacidades: np.ndarray = np.array(tuple(camiones.keys()),
+                                       dtype=np.int64)
+    # Los precios ya están cuantizados a 1.00, el pasaje es exacto
+    catalogo: np.ndarray = np.array(tuple(int(p * 100)
+                                          for p in camiones.values()),
+                                    dtype=np.int64)
+    t, d, s = np.broadcast_arrays(np.asarray(totales, dtype=np.float64),
+                                  np.asarray(distancias, dtype=np.float64),
+                                  np.asarray(sueldos, dtype=np.float64))
+    metros: np.ndarray = np.rint(d * 1000).astype(np.int64)
+    centavos: np.ndarray = np.rint(s * 100).astype(np.int64)
+    carga: np.ndarray = t + float(moda) / 2
+    if precios is not None:
+        precios = np.rint(np.asarray(precios, dtype=np.float64)
+                          * 100).astype(np.int64)
+        precios = np.broadcast_to(precios, (len(t), len(capacidades)))
+    S: int = len(t)
+    tipos: np.ndarray = np.empty(S, dtype=np.int64)
+    cantidades: np.ndarray = np.empty(S, dtype=np.int64)
+    costos: np.ndarray = np.empty(S, dtype=np.int64)
+    for i in range(0, S, BLOQUE):
+        j: int = min(i + BLOQUE, S)
+        p: np.ndarray = catalogo if precios is None else precios[i:j]
+        # Precio por kilómetro (centavos) por metros, redondeado
+        tramo: np.ndarray = (p * metros[i:j, None] + 500) // 1000
+        cant: np.ndarray = (carga[i:j, None]
+                            // capacidades).astype(np.int64)
+        costo: np.ndarray = cant * (tramo + centavos[i:j, None])
+        ideal: np.ndarray = np.argmin(costo, axis=1)
+        filas: np.ndarray = np.arange(j - i)
+        tipos[i:j] = capacidades[ideal]
+        cantidades[i:j] = cant[filas, ideal]
+        costos[i:j] = costo[filas, ideal]
+    return (tipos, cantidades, costos)
+
+
+def triangular(u: np.ndarray, minimo: float, moda: float,
+               maximo: float, /) -> np.ndarray:
+    """
+    Transforma números uniformes en pesos con distribución triangular
+    mediante la transformada inversa, igual que en el cálculo de vacas
+    pero operando sobre un vector completo.
+    """
+    u = np.asarray(u, dtype=np.float64)
+    fc: float = (moda - minimo) / (maximo - minimo)
+    return np.where(u < fc,
+                    minimo + np.sqrt(u * (maximo - minimo)
+                                     * (moda - minimo)),
+                    maximo - np.sqrt((1 - u) * (maximo - minimo)
+                                     * (maximo - moda)))
+
+
+def momentos_triangular(minimo: float, moda: float,
+                        maximo: float, /) -> tuple[float, float]:
+    """
+    Devuelve la media y la varianza de una distribución triangular,
+    conocidas en forma cerrada.
+    """
+    media: float = (minimo + moda + maximo) / 3
+    varianza: float = (minimo ** 2 + moda ** 2 + maximo ** 2
+                       - minimo * moda - minimo * maximo
+                       - moda * maximo) / 18
+    return (media, varianza)
+
+
+def uniformes_reducidas(u: np.ndarray, n: int, modo: str,
+                        estratos: int = 0, /) -> np.ndarray | None:
+    """
+    Obtiene n uniformes para una réplica a partir de los uniformes
+    generados, según el modo de muestreo elegido:
+    "simple" usa n uniformes tal cual;
+    "antitetico" usa la mitad (redondeada hacia arriba) y sus
+    complementos 1-u;
+    "estratificado" divide [0;1) en estratos de igual tamaño con la
+    misma cantidad de vacas cada uno (estratos debe dividir a n;
+    0 equivale a un estrato por vaca);
+    "hipercubo" (Latin hypercube) es un alias de "estratificado" con
+    un estrato por vaca: en una sola dimensión, permutar los estratos
+    no cambia la suma, por lo que no aporta otra reducción.
+    Debe proveerse la cantidad de uniformes que indica
+    uniformes_necesarios. En caso de error, se devuelve None.
+    """
+    i: np.ndarray
+    if modo == "hipercubo":
+        modo, estratos = "estratificado", 0
+    if modo == "simple":
+        return u[:n]
+    elif modo == "antitetico":
+        h: int = (n + 1) // 2
+        return np.concatenate((u[:h], 1 - u[:h]))[:n]
+    elif modo == "estratificado":
+        if estratos == 0:
+            estratos = n
+        if estratos < 0 or n % estratos != 0:
+            print("Error: la cantidad de estratos debe dividir",
+                  "a la cantidad de vacas.")
+            return None
+        i = np.arange(n) % estratos
+        return (i + u[:n]) / estratos
+    print("Error: modo de muestreo desconocido.")
+    return None
+
+
+def uniformes_necesarios(n: int, modo: str, /) -> int:
+    """
+    Cantidad de uniformes que consume una réplica de n vacas
+    según el modo de muestreo.
+    """
+    if modo == "antitetico":
+        return (n + 1) // 2
+    return n
+
+
+def muestreo_reducido(n: int, replicas: int, minimo: float,
+                      moda: float, maximo: float, modo: str = "simple",
+                      estratos: int = 0, generador: str = "congruencias",
+                      /) -> tuple[float, float, float] | None:
+    """
+    Estima el peso total de n vacas repitiendo la simulación
+    (réplicas) con el modo de muestreo indicado; los uniformes se
+    obtienen del generador indicado (por defecto, Congruencias
+    Fundamental) y pasan por la transformada triangular.
+    Devuelve la media de los totales, su varianza entre réplicas y la
+    reducción de varianza lograda: el cociente entre la varianza
+    exacta del muestreo simple (n veces la de una vaca) y la
+    observada. Un valor de 4 indica que se alcanza la misma precisión
+    con la cuarta parte de las réplicas.
+    En caso de error, se devuelve None.
+    """
+    if replicas < 2:
+        print("Error: se necesitan al menos dos réplicas.")
+        return None
+    c: int = uniformes_necesarios(n, modo)
+    cf = generar(Estructura(c * replicas, generador))
+    if cf is None:
+        return None
+    u: np.ndarray = np.fromiter((var[1] for var in cf),
+                                dtype=np.float64, count=c * replicas)
+    totales: np.ndarray = np.empty(replicas, dtype=np.float64)
+    v: np.ndarray | None
+    for r in range(replicas):
+        v = uniformes_reducidas(u[r*c:(r+1)*c], n, modo, estratos)
+        if v is None:
+            return None
+        totales[r] = triangular(v, minimo, moda, maximo).sum()
+    varianza: float = float(totales.var(ddof=1))
+    simple: float = n * momentos_triangular(minimo, moda, maximo)[1]
+    reduccion: float = simple / varianza if varianza > 0 else float("inf")
+    return (float(totales.mean()), varianza, reduccion)
+
+
+def peso_total(n: int, minimo: float, moda: float, maximo: float,
+               camiones: dict[int, Decimal], distancia: Decimal,
+               sueldo: Decimal, confianza: float = 0.95,
+               umbral: int = 100000, por_vaca: bool = False,
+               /) -> dict | None:
+    """
+    Estima el peso total de n vacas y el transporte necesario.
+    El total es una suma de n variables triangulares independientes,
+    cuya media y varianza se conocen; por el teorema central del
+    límite, para n grande se aproxima por una normal y el resultado
+    se obtiene en tiempo constante. Sólo se simula (como en el
+    cálculo) si n es menor al umbral o si se piden los pesos por vaca.
+    Devuelve un diccionario con el total esperado (o simulado), el
+    desvío, el intervalo normal con la confianza indicada centrado en
+    ese total, y para los extremos y el centro del intervalo: la
+    capacidad del camión ideal, la cantidad de camiones y el costo
+    (en centavos). Así, al simular, el valor central corresponde al
+    total simulado.
+    Los pesos por vaca sólo se incluyen al simular; sino, son None.
+    Para simular se necesitan al menos 2 vacas.
+    En caso de que exista un error, se devuelve None.
+    """
+    media: float
+    varianza: float
+    media, varianza = momentos_triangular(minimo, moda, maximo)
+    media *= n
+    desvio: float = sqrt(varianza * n)
+    z: float = float(stats.norm.ppf((1 + confianza) / 2))
+    total: float = media
+    pesos: np.ndarray | None = None
+    if n < umbral or por_vaca:
+        if n < 2:   # Con menos, no hay semillas de Von Neumann
+            print("Error: se necesitan al menos 2 vacas para simular.")
+            return None
+        cf = generar(Estructura(n))
+        if cf is None:
+            return None
+        pesos = triangular(np.fromiter((var[1] for var in cf),
+                                       dtype=np.float64, count=n),
+                           minimo, moda, maximo)
+        total = float(pesos.sum())
+    # La cantidad de camiones crece con el total: sus cuantiles salen
+    # directamente de los cuantiles del total
+    cuantiles: np.ndarray = np.array((total - z * desvio, total,
+                                      total + z * desvio))
+    tipos, cantidades, costos = costos_camiones(
+        camiones, cuantiles, float(distancia), float(sueldo), None,
+        Decimal(moda))
+    return {"total": total, "desvio": desvio,
+            "inferior": float(cuantiles[0]),
+            "superior": float(cuantiles[2]),
+            "tipos": tipos.tolist(), "cantidades": cantidades.tolist(),
+            "costos": costos.tolist(), "pesos": pesos}
+
+
+def aleatoria(x: tuple[tuple[tuple[int, ...],
+                             float], ...], /) -> bool:
+    """
+    Indica si la muestra pasa las cuatro pruebas de aleatoriedad.
+    """
+    return monobits(x) and chi_cuadrado(x) and poker(x) and rachas(x)
+
+
+class Acumulador:
+    """
+    Resume los pesos de las vacas a medida que se obtienen, sin
+    guardarlos a todos: suma compensada (Kahan-Neumaier), media y
+    varianza (Welford), mínimo, máximo, vacas por marca y un
+    histograma fino del rango de pesos, del que se estiman los
+    cuantiles (con error de a lo sumo un contenedor).
+    Sólo se conservan los primeros pesos (hasta el límite), para
+    mostrarlos; si se indica un destino (archivo abierto), se
+    escriben allí todos los pesos, uno por línea.
+    """
+    contenedores: int = 1024    # Resolución del histograma de pesos
+    limite: int = 1000          # Pesos que se conservan para mostrar
+    n: int = 0                  # Cantidad de pesos acumulados
+    suma: float = 0.0
+    compensacion: float = 0.0   # Error acumulado por redondeo
+    media: float = 0.0
+    m2: float = 0.0             # Suma de cuadrados de desvíos
+    menor: float = float("inf")
+    mayor: float = float("-inf")
+
+    def __init__(self, cant_marcas: int, minimo: float, maximo: float,
+                 destino: TextIO | None = None, /) -> None:
+        self.cant_marcas = cant_marcas
+        self.minimo = minimo
+        self.maximo = maximo
+        self.destino = destino
+        self.marcas: dict[int, int] = {}
+        for i in range(cant_marcas):
+            self.marcas[i] = 0
+        self.histograma: list[int] = [0] * self.contenedores
+        self.primeros: list[float] = []
+
+    def agregar(self, peso: float, /) -> None:
+        clave: int = round((((peso-self.minimo)
+                             / (self.maximo-self.minimo))
+                            * self.cant_marcas)-0.5)
+        self.marcas[clave] = self.marcas[clave] + 1
+        clave = min(int((peso-self.minimo) / (self.maximo-self.minimo)
+                        * self.contenedores), self.contenedores-1)
+        self.histograma[clave] += 1
+        # Suma de Neumaier: recupera lo que se pierde al redondear
+        t: float = self.suma + peso
+        if abs(self.suma) >= abs(peso):
+            self.compensacion += (self.suma - t) + peso
+        else:
+            self.compensacion += (peso - t) + self.suma
+        self.suma = t
+        self.n += 1
+        d: float = peso - self.media
+        self.media += d / self.n
+        self.m2 += d * (peso - self.media)
+        self.menor = min(self.menor, peso)
+        self.mayor = max(self.mayor, peso)
+        if len(self.primeros) < self.limite:
+            self.primeros.append(peso)
+        if self.destino is not None:
+            self.destino.write(repr(peso) + "\n")
+
+    def total(self, /) -> float:
+        return self.suma + self.compensacion
+
+    def varianza(self, /) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def cuantil(self, q: float, /) -> float:
+        """
+        Estima el cuantil q (entre 0 y 1) interpolando dentro del
+        contenedor del histograma donde se alcanza.
+        """
+        objetivo: float = q * self.n
+        ancho: float = (self.maximo - self.minimo) / self.contenedores
+        acumulado: int = 0
+        for i in range(self.contenedores):
+            if self.histograma[i] > 0 \
+                    and acumulado + self.histograma[i] >= objetivo:
+                return (self.minimo + ancho
+                        * (i + (objetivo - acumulado)
+                           / self.histograma[i]))
+            acumulado += self.histograma[i]
+        return self.maximo
+
+
+def pesaje(x: tuple[tuple[tuple[int, ...], float], ...],
+           cant_marcas: int, moda: Decimal, minimo: Decimal,
+           maximo: Decimal, destino: TextIO | None = None,
+           /) -> Acumulador:
+    """
+    Obtiene el peso de cada vaca con la transformada inversa de la
+    distribución triangular, a partir de los números flotantes.
+    Devuelve el resumen de los pesos, incluyendo la cantidad de vacas
+    por marca (cada marca abarca una porción igual del rango de
+    pesos) y el peso total. Si se indica un destino (archivo abierto),
+    se escriben allí todos los pesos.
+    """
+    acumulador = Acumulador(cant_marcas, float(minimo), float(maximo),
+                            destino)
+    fc: Decimal = (moda-minimo)/(maximo-minimo)
+    aux: float
+    for var in x:
+        if var[1] < fc:
+            aux = float(minimo) + sqrt(var[1]
+                                       * float(maximo-minimo)
+                                       * float(moda-minimo))
+        else:
+            aux = float(maximo) - sqrt((1-var[1])
+                                       * float(maximo-minimo)
+                                       * float(maximo-moda))
+        acumulador.agregar(aux)
+    return acumulador
+
+
+def costeo(dicc: dict[int, Decimal], suma: float, moda: Decimal,
+           distancia: Decimal, sueldo: Decimal,
+           /) -> tuple[int, int, Decimal]:
+    """
+    Elige el tipo de camión más barato para transportar el peso total.
+    Devuelve su capacidad, la cantidad de camiones y el costo.
+    """
+    tupla: tuple[tuple[int, Decimal], ...] = tuple(dicc.items())
+    cantidad: int
+    precio: Decimal
+    peso: int = tupla[0][0]
+    camiones: int = (Decimal(suma)
+                     + (moda / 2)) // tupla[0][0]
+    ideal: Decimal = camiones * (tupla[0][1] * distancia
+                                 + sueldo)
+    for i in range(1, len(tupla)):
+        cantidad = (Decimal(suma) + (moda / 2)) // tupla[i][0]
+        precio = cantidad * (tupla[i][1] * distancia + sueldo)
+        if precio < ideal:
+            camiones = cantidad
+            peso = tupla[i][0]
+            ideal = precio
+    return (peso, camiones, ideal)
+
+
+def simulacion(dicc: dict[int, Decimal], sueldo: Decimal,
+               cant_marcas: int, cant_vacas: int, moda: Decimal,
+               minimo: Decimal, maximo: Decimal, distancia: Decimal,
+               x: tuple[tuple[tuple[int, ...], float], ...] | None = None,
+               destino: TextIO | None = None,
+               veredicto: bool | None = None,
+               /) -> dict | None:
+    """
+    Realiza el mismo cálculo que la ventana, sin interfaz gráfica.
+    Los valores deben controlarse desde afuera (como en la ventana).
+    Si no se indican los números aleatorios, se generan con la
+    estructura por defecto. Los pesos de cada vaca no se guardan,
+    salvo que se indique un destino (archivo abierto) donde escribirlos.
+    Si ya se conoce el veredicto de las pruebas para x, puede
+    indicarse para no repetirlas.
+    Devuelve un diccionario con el veredicto de las pruebas, las vacas
+    por marca, el peso total, la media, la varianza, el mínimo, el
+    máximo y los cuartiles de los pesos, el camión ideal, la cantidad
+    de camiones y el costo.
+    En caso de que no se puedan generar los números, se devuelve None.
+    """
+    if x is None:
+        x = generar(Estructura(cant_vacas))
+        if x is None:
+            return None
+    pesos: Acumulador = pesaje(x, cant_marcas, moda, minimo, maximo,
+                               destino)
+    peso: int
+    camiones: int
+    ideal: Decimal
+    peso, camiones, ideal = costeo(dicc, pesos.total(), moda, distancia,
+                                   sueldo.quantize(Decimal("1.00")))
+    if veredicto is None:
+        veredicto = aleatoria(x)
+    return {"aleatoria": veredicto, "marcas": pesos.marcas,
+            "total": pesos.total(), "media": pesos.media,
+            "varianza": pesos.varianza(), "minimo": pesos.menor,
+            "maximo": pesos.mayor,
+            "cuartiles": [pesos.cuantil(q) for q in (0.25, 0.5, 0.75)],
+            "camion": peso, "camiones": camiones, "costo": ideal}
 
 
 def alta(e_peso: Entry, c_peso: Label, e_precio: Entry, c_precio: Label,
@@ -440,127 +1316,53 @@ def baja(lista: dict, listado: Listbox, /) -> None:
                  + "primero debe seleccionar uno.")
 
 
-lista: dict[int, Decimal] = {}
-inicio = Tk()
-inicio.title("Integrador de Modelo y Simulación")
-inicio.resizable(False, False)
-Label(inicio, text="Datos",
-      font=("Times New Roman", 28,
-            "bold")).grid(row=0, column=0, columnspan=12)
-Label(inicio, text="Camiones",
-      font=("Unicode", 14,
-            "roman")).grid(row=1, column=0, columnspan=2)
-Label(inicio, text="Capacidad (kg)",
-      font=("Arial", 12, "italic")).grid(row=2, column=0)
-Label(inicio, text="Consumo ($/l)",
-      font=("Arial", 12, "italic")).grid(row=4, column=0)
-e_peso = Entry(inicio, highlightthickness=1,
-               highlightbackground="black", highlightcolor="black")
-e_precio = Entry(inicio, highlightthickness=1,
-                 highlightbackground="black", highlightcolor="black")
-c_peso = Label(inicio, text="", font=("Helvetica", 10),
-               foreground="#ff0000", padx=0, pady=0)
-c_precio = Label(inicio, text="", font=("Helvetica", 10),
-                 foreground="#ff0000", padx=0, pady=0)
-e_peso.grid(row=2, column=1)
-e_precio.grid(row=4, column=1)
-c_peso.grid(row=3, column=0, columnspan=2)
-c_precio.grid(row=5, column=0, columnspan=2)
-transportes = Frame(inicio)
-barra_uno = Scrollbar(transportes)
-listado = Listbox(transportes, height=9,
-                  yscrollcommand=barra_uno.set)
-barra_uno.config(command=listado.yview)
-barra_uno.pack(side="right")
-listado.pack(side="left", fill="x")
-transportes.grid(row=7, column=0, rowspan=3, columnspan=2)
-agregar = Button(inicio, text='Agregar', background="#eeeeee",
-                 foreground="#000000", font=("Unicode", 14, "roman"),
-                 command=partial(alta, e_peso, c_peso, e_precio,
-                                 c_precio, lista, listado), pady=0)
-eliminar = Button(inicio, text='Eliminar', background="#eeeeee",
-                  foreground="#000000", font=("Unicode", 14, "roman"),
-                  command=partial(baja, lista, listado), pady=0)
-agregar.grid(row=6, column=0)
-eliminar.grid(row=6, column=1)
-Label(inicio, text="Cantidad de vacas",
-      font=("Arial", 12, "italic")).grid(row=4, column=3, sticky="w")
-Label(inicio, text="Sueldo de conductor ($)",
-      font=("Arial", 12,
-            "italic")).grid(row=1, column=2, columnspan=2, padx=20)
-Label(inicio, text="Cantidad de marcas",
-      font=("Arial", 12, "italic")).grid(row=1, column=4,
-                                         columnspan=2, padx=20)
-Label(inicio, text="Peso moda de vaca (kg)",
-      font=("Arial", 12, "italic")).grid(row=4, column=5, sticky="w")
-Label(inicio, text="Peso mínimo de vaca", pady=0,
-      font=("Arial", 12, "italic")).grid(row=6, column=3, sticky="sw",
-                                         ipady=0)
-Label(inicio, text="Peso máximo de vaca", pady=0,
-      font=("Arial", 12, "italic")).grid(row=6, column=5, sticky="s",
-                                         ipady=0)
-Label(inicio, text="Distancia a recorrer (km)",
-      font=("Arial", 12,
-            "italic")).grid(row=1, column=6, columnspan=2)
-e1 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e2 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e3 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e4 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e5 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e6 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e7 = Entry(inicio, highlightthickness=1,
-           highlightbackground="black", highlightcolor="black")
-e1.grid(row=2, column=2, columnspan=2)
-e2.grid(row=2, column=4, columnspan=2)
-e3.grid(row=5, column=2, columnspan=2)
-e4.grid(row=5, column=4, columnspan=2)
-e5.grid(row=7, column=2, columnspan=2, sticky='n')
-e6.grid(row=7, column=4, columnspan=2, sticky='n')
-e7.grid(row=2, column=6, columnspan=2)
-c1 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c2 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c3 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c4 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c5 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c6 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c7 = Label(inicio, text="", font=("Helvetica", 10),
-           foreground="#ff0000", padx=0, pady=0)
-c1.grid(row=3, column=2, columnspan=2)
-c2.grid(row=3, column=4, columnspan=2)
-c3.grid(row=6, column=2, columnspan=2, sticky="n")
-c4.grid(row=6, column=4, columnspan=2, sticky="n")
-c5.grid(row=7, column=2, columnspan=2, sticky="s")
-c6.grid(row=7, column=4, columnspan=2, sticky="s")
-c7.grid(row=3, column=6, columnspan=2)
-conf = Label(inicio, text="", font=("Verdana", 12),
-             foreground="#000000")
-conf.grid(row=9, column=2, columnspan=4, sticky="s")
-res = Label(inicio, text="Peso total de vacas:",
-            font=("Cambria", 14))
-res.grid(row=9, column=2, columnspan=4, sticky="n")
-Label(inicio, text="Pesos (kg)",
-      font=("Unicode", 14,
-            "roman")).grid(row=4, column=6, columnspan=2)
-ganado = Frame(inicio)
-barra_dos = Scrollbar(ganado)
-vacas = Listbox(ganado, height=12,
-                yscrollcommand=barra_dos.set)
-barra_dos.config(command=vacas.yview)
-barra_dos.pack(side="right", expand=True, fill="y")
-vacas.pack(side="left", expand=True, fill="both")
-ganado.grid(row=5, column=6, rowspan=5, columnspan=2)
+def etapa(memoria: dict[str, tuple], nombre: str, clave: tuple,
+          funcion, /, *args) -> object:
+    """
+    Devuelve el resultado de una etapa del cálculo, guardado en la
+    memoria junto con la clave de sus datos de entrada; sólo se vuelve
+    a calcular si la clave cambió. La clave de cada etapa incluye la
+    de las etapas de las que depende, por lo que un cambio se
+    propaga únicamente hacia adelante.
+    Qué se vuelve a mostrar no depende de esto, sino de las claves
+    de lo mostrado (ver limpiar).
+    """
+    if nombre in memoria and memoria[nombre][0] == clave:
+        return memoria[nombre][1]
+    valor = funcion(*args)
+    memoria[nombre] = (clave, valor)
+    return valor
+
+
+def limpiar(ventana: Tk, resultado: Label, confianza: Label,
+            l_vacas: Listbox, memoria: dict[str, tuple], /) -> None:
+    """
+    Borra los resultados mostrados; la próxima vez se mostrarán
+    de nuevo aunque los cálculos guardados sigan valiendo.
+    """
+    resultado.config(text="Peso total de vacas:")
+    confianza.config(text="")
+    for widget in ventana.winfo_children():
+        if isinstance(widget, Toplevel):
+            widget.destroy()
+    l_vacas.delete(0, "end")
+    for nombre in ("vacas", "grafico", "etiquetas", "costo"):
+        memoria.pop(nombre, None)
+
+
+def mostrar_costo(memoria: dict[str, tuple], clave: tuple, peso: int,
+                  camiones: int, ideal: Decimal, /) -> None:
+    """
+    Actualiza las etiquetas del costo en el gráfico abierto, sólo si
+    la clave del costo cambió; el resto del gráfico no depende de él.
+    """
+    if memoria.get("costo") == clave:
+        return
+    camion, cantidad, costo = memoria["etiquetas"]
+    camion.config(text="Tipo de camión ideal: " + str(peso) + "kg.")
+    cantidad.config(text="Cantidad de camiones: " + str(camiones))
+    costo.config(text="Costo: $" + str(ideal))
+    memoria["costo"] = clave
 
 
 def calculo(ventana: Tk, dicc: dict[int, Decimal], e_sueldo: Entry,
@@ -569,7 +1371,17 @@ def calculo(ventana: Tk, dicc: dict[int, Decimal], e_sueldo: Entry,
             c_moda: Label, e_minimo: Entry, c_minimo: Label,
             e_maximo: Entry, c_maximo: Label, e_distancia: Entry,
             c_distancia: Label, resultado: Label, confianza: Label,
-            l_vacas: Listbox, /) -> None:
+            l_vacas: Listbox, memoria: dict[str, tuple],
+            guardar: BooleanVar, /) -> None:
+    """
+    Valida los datos de la ventana y muestra los resultados.
+    Las etapas (generación y pruebas; pesos y marcas; costo) se
+    guardan en la memoria y sólo se recalculan, y se vuelven a
+    mostrar, las que dependen de datos que cambiaron.
+    Si se marcó guardar, se pide un archivo donde escribir los pesos
+    de todas las vacas, salvo que ya se hayan guardado con los mismos
+    datos; si los pesos deben calcularse, se escriben al calcularlos.
+    """
     c_sueldo.config(text="")
     c_marcas.config(text="")
     c_vacas.config(text="")
@@ -577,12 +1389,6 @@ def calculo(ventana: Tk, dicc: dict[int, Decimal], e_sueldo: Entry,
     c_minimo.config(text="")
     c_maximo.config(text="")
     c_distancia.config(text="")
-    resultado.config(text="Peso total de vacas:")
-    confianza.config(text="")
-    for widget in ventana.winfo_children():
-        if isinstance(widget, Toplevel):
-            widget.destroy()
-    l_vacas.delete(0, "end")
     sueldo: Decimal
     cant_marcas: int
     cant_vacas: int
@@ -659,45 +1465,78 @@ def calculo(ventana: Tk, dicc: dict[int, Decimal], e_sueldo: Entry,
                  + "primero debe cargar al menos un tipo.")
         invalido = True
     if invalido:
+        limpiar(ventana, resultado, confianza, l_vacas, memoria)
         return
     sueldo = sueldo.quantize(Decimal("1.00"))
     if minimo < moda < maximo:
         estruct = Estructura(cant_vacas)  # 60383
-        cf = congruencias_fundamental(estruct)
+        # Claves de cada etapa: incluyen las de las etapas anteriores
+        c_gen: tuple = (estruct.n, estruct.generador, estruct.a,
+                        estruct.c, estruct.k, estruct.m, estruct.x,
+                        estruct.salto)
+        c_pes: tuple = c_gen + (cant_marcas, moda, minimo, maximo)
+        c_cos: tuple = c_pes + (tuple(dicc.items()), distancia, sueldo)
+        cf = etapa(memoria, "generacion", c_gen, generar, estruct)
         if cf != None:
-            if monobits(cf) and chi_cuadrado(cf) \
-                    and poker(cf) and rachas(cf):
-                confianza.config(text="La muestra de vacas es "
-                                 + "suficientemente aleatoria")
+            pesos: Acumulador
+            archivo: str = ""
+            # Los pesos se escriben sólo si se pidió y aún no se
+            # guardaron con estos datos
+            if guardar.get() and memoria.get("guardado") != c_pes:
+                archivo = asksaveasfilename(
+                    title="Guardar pesos", defaultextension=".txt")
+            if archivo:
+                with open(archivo, "w") as destino:
+                    # Si los pesos deben calcularse, se escriben a la vez
+                    pesos = etapa(memoria, "pesaje", c_pes, pesaje, cf,
+                                  cant_marcas, moda, minimo, maximo,
+                                  destino)
+                    if pesos.destino is not destino:    # Ya calculados
+                        pesaje(cf, cant_marcas, moda, minimo, maximo,
+                               destino)
+                memoria["guardado"] = c_pes
             else:
-                confianza.config(text="La muestra de vacas no es "
-                                 + "suficientemente aleatoria")
-            dict_marcas: dict[int, int] = {}
-            clave: int
-            for i in range(cant_marcas):
-                dict_marcas[i] = 0
-            lis_vacas: list[float] = []
+                pesos = etapa(memoria, "pesaje", c_pes, pesaje, cf,
+                              cant_marcas, moda, minimo, maximo)
+            dict_marcas: dict[int, int] = pesos.marcas
+            suma: float = pesos.total()
+            peso: int
+            camiones: int
+            ideal: Decimal
+            peso, camiones, ideal = etapa(memoria, "costeo", c_cos, costeo,
+                                          dicc, suma, moda, distancia,
+                                          sueldo)
             fc: Decimal = (moda-minimo)/(maximo-minimo)
             aux: float
-            suma: float = 0.0
-            for var in cf:
-                if var[1] < fc:
-                    aux = float(minimo) + sqrt(var[1]
-                                               * float(maximo-minimo)
-                                               * float(moda-minimo))
+            if memoria.get("vacas") != c_pes:
+                if etapa(memoria, "pruebas", c_gen, aleatoria, cf):
+                    confianza.config(text="La muestra de vacas es "
+                                     + "suficientemente aleatoria")
                 else:
-                    aux = float(maximo) - sqrt((1-var[1])
-                                               * float(maximo-minimo)
-                                               * float(maximo-moda))
-                clave = round((((aux-float(minimo))
-                                / float(maximo-minimo))
-                               * cant_marcas)-0.5)
-                dict_marcas[clave] = dict_marcas[clave] + 1
-                lis_vacas.append(aux)
-                l_vacas.insert("end", aux)
-                suma += aux
-            resultado.config(text="Peso total de vacas: "
-                             + str(suma) + " kg.")
+                    confianza.config(text="La muestra de vacas no es "
+                                     + "suficientemente aleatoria")
+                l_vacas.delete(0, "end")
+                for aux in pesos.primeros:
+                    l_vacas.insert("end", aux)
+                if pesos.n > len(pesos.primeros):
+                    l_vacas.insert("end", "... y "
+                                   + str(pesos.n - len(pesos.primeros))
+                                   + " vacas más")
+                resultado.config(text="Peso total de vacas: "
+                                 + str(suma) + " kg.")
+                memoria["vacas"] = c_pes
+            graficos: list[Toplevel] = [
+                widget for widget in ventana.winfo_children()
+                if isinstance(widget, Toplevel)]
+            # Si el gráfico sigue abierto y los pesos no cambiaron, no
+            # se redibuja: sólo se actualiza el costo
+            if memoria.get("grafico") == c_pes and graficos:
+                mostrar_costo(memoria, c_cos, peso, camiones, ideal)
+                return
+            for widget in graficos:
+                widget.destroy()
+            memoria["grafico"] = c_pes
+            memoria.pop("costo", None)
             salida: Toplevel = Toplevel(ventana, width=800,
                                         height=600)
             salida.title("Gráfico")
@@ -735,32 +1574,12 @@ def calculo(ventana: Tk, dicc: dict[int, Decimal], e_sueldo: Entry,
                   foreground="#000000").grid(row=7, column=0)
             Label(marcador, text="Eje Y: P(X)",
                   foreground="#000000").grid(row=7, column=1)
-            tupla: tuple[tuple[int, Decimal], ...] = tuple(dicc.items())
-            cantidad: int
-            precio: Decimal
-            peso: int = tupla[0][0]
-            camiones: int = (Decimal(suma)
-                             + (moda / 2)) // tupla[0][0]
-            ideal: Decimal = camiones * (tupla[0][1] * distancia
-                                         + sueldo)
-            for i in range(1, len(tupla)):
-                cantidad = (Decimal(suma) + (moda / 2)) // tupla[i][0]
-                precio = cantidad * (tupla[i][1] * distancia + sueldo)
-                if precio < ideal:
-                    camiones = cantidad
-                    peso = tupla[i][0]
-                    ideal = precio
-            Label(marcador, text="Tipo de camión ideal: " + str(peso)
-                                 + "kg.",
-                  foreground="#000000").grid(row=8, column=0,
-                                             columnspan=2)
-            Label(marcador, text="Cantidad de camiones: "
-                                 + str(camiones),
-                  foreground="#000000").grid(row=9, column=0,
-                                             columnspan=2)
-            Label(marcador, text="Costo: $" + str(ideal),
-                  foreground="#000000").grid(row=10, column=0,
+            memoria["etiquetas"] = tuple(
+                Label(marcador, foreground="#000000") for _ in range(3))
+            for i in range(3):  # Camión ideal, cantidad y costo
+                memoria["etiquetas"][i].grid(row=8+i, column=0,
                                              columnspan=2)
+            mostrar_costo(memoria, c_cos, peso, camiones, ideal)
             marcador.pack(side="right")
             for marca in dict_marcas.items():
                 aux = float(minimo) + ((marca[0] + 0.5)
@@ -908,17 +1727,147 @@ def calculo(ventana: Tk, dicc: dict[int, Decimal], e_sueldo: Entry,
             tortuga.goto(270, -180)
             tortuga.up()
         else:
+            limpiar(ventana, resultado, confianza, l_vacas, memoria)
             showinfo("Cálculo", "No se puede generar la cantidad de "
                      + "vacas aleatorias deseadas.")
     else:
+        limpiar(ventana, resultado, confianza, l_vacas, memoria)
         showinfo("Cálculo", "Los valores de los pesos de vacas "
                  + "no tienen sentido, se solapan.")
 
 
-calcular = Button(inicio, text="Calcular", background="#eeeeee",
-                  foreground="#000000", font=("Unicode", 14, "roman"),
-                  command=partial(calculo, inicio, lista, e1, c1, e2,
-                                  c2, e3, c3, e4, c4, e5, c5, e6, c6,
-                                  e7, c7, res, conf, vacas))
-calcular.grid(row=8, column=3, columnspan=3)
-inicio.mainloop()
+if __name__ == "__main__":
+    lista: dict[int, Decimal] = {}
+    memoria: dict[str, tuple] = {}  # Etapas ya calculadas
+    inicio = Tk()
+    inicio.title("Integrador de Modelo y Simulación")
+    inicio.resizable(False, False)
+    Label(inicio, text="Datos",
+          font=("Times New Roman", 28,
+                "bold")).grid(row=0, column=0, columnspan=12)
+    Label(inicio, text="Camiones",
+          font=("Unicode", 14,
+                "roman")).grid(row=1, column=0, columnspan=2)
+    Label(inicio, text="Capacidad (kg)",
+          font=("Arial", 12, "italic")).grid(row=2, column=0)
+    Label(inicio, text="Consumo ($/l)",
+          font=("Arial", 12, "italic")).grid(row=4, column=0)
+    e_peso = Entry(inicio, highlightthickness=1,
+                   highlightbackground="black", highlightcolor="black")
+    e_precio = Entry(inicio, highlightthickness=1,
+                     highlightbackground="black", highlightcolor="black")
+    c_peso = Label(inicio, text="", font=("Helvetica", 10),
+                   foreground="#ff0000", padx=0, pady=0)
+    c_precio = Label(inicio, text="", font=("Helvetica", 10),
+                     foreground="#ff0000", padx=0, pady=0)
+    e_peso.grid(row=2, column=1)
+    e_precio.grid(row=4, column=1)
+    c_peso.grid(row=3, column=0, columnspan=2)
+    c_precio.grid(row=5, column=0, columnspan=2)
+    transportes = Frame(inicio)
+    barra_uno = Scrollbar(transportes)
+    listado = Listbox(transportes, height=9,
+                      yscrollcommand=barra_uno.set)
+    barra_uno.config(command=listado.yview)
+    barra_uno.pack(side="right")
+    listado.pack(side="left", fill="x")
+    transportes.grid(row=7, column=0, rowspan=3, columnspan=2)
+    agregar = Button(inicio, text='Agregar', background="#eeeeee",
+                     foreground="#000000", font=("Unicode", 14, "roman"),
+                     command=partial(alta, e_peso, c_peso, e_precio,
+                                     c_precio, lista, listado), pady=0)
+    eliminar = Button(inicio, text='Eliminar', background="#eeeeee",
+                      foreground="#000000", font=("Unicode", 14, "roman"),
+                      command=partial(baja, lista, listado), pady=0)
+    agregar.grid(row=6, column=0)
+    eliminar.grid(row=6, column=1)
+    Label(inicio, text="Cantidad de vacas",
+          font=("Arial", 12, "italic")).grid(row=4, column=3, sticky="w")
+    Label(inicio, text="Sueldo de conductor ($)",
+          font=("Arial", 12,
+                "italic")).grid(row=1, column=2, columnspan=2, padx=20)
+    Label(inicio, text="Cantidad de marcas",
+          font=("Arial", 12, "italic")).grid(row=1, column=4,
+                                             columnspan=2, padx=20)
+    Label(inicio, text="Peso moda de vaca (kg)",
+          font=("Arial", 12, "italic")).grid(row=4, column=5, sticky="w")
+    Label(inicio, text="Peso mínimo de vaca", pady=0,
+          font=("Arial", 12, "italic")).grid(row=6, column=3, sticky="sw",
+                                             ipady=0)
+    Label(inicio, text="Peso máximo de vaca", pady=0,
+          font=("Arial", 12, "italic")).grid(row=6, column=5, sticky="s",
+                                             ipady=0)
+    Label(inicio, text="Distancia a recorrer (km)",
+          font=("Arial", 12,
+                "italic")).grid(row=1, column=6, columnspan=2)
+    e1 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e2 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e3 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e4 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e5 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e6 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e7 = Entry(inicio, highlightthickness=1,
+               highlightbackground="black", highlightcolor="black")
+    e1.grid(row=2, column=2, columnspan=2)
+    e2.grid(row=2, column=4, columnspan=2)
+    e3.grid(row=5, column=2, columnspan=2)
+    e4.grid(row=5, column=4, columnspan=2)
+    e5.grid(row=7, column=2, columnspan=2, sticky='n')
+    e6.grid(row=7, column=4, columnspan=2, sticky='n')
+    e7.grid(row=2, column=6, columnspan=2)
+    c1 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c2 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c3 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c4 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c5 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c6 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c7 = Label(inicio, text="", font=("Helvetica", 10),
+               foreground="#ff0000", padx=0, pady=0)
+    c1.grid(row=3, column=2, columnspan=2)
+    c2.grid(row=3, column=4, columnspan=2)
+    c3.grid(row=6, column=2, columnspan=2, sticky="n")
+    c4.grid(row=6, column=4, columnspan=2, sticky="n")
+    c5.grid(row=7, column=2, columnspan=2, sticky="s")
+    c6.grid(row=7, column=4, columnspan=2, sticky="s")
+    c7.grid(row=3, column=6, columnspan=2)
+    conf = Label(inicio, text="", font=("Verdana", 12),
+                 foreground="#000000")
+    conf.grid(row=9, column=2, columnspan=4, sticky="s")
+    res = Label(inicio, text="Peso total de vacas:",
+                font=("Cambria", 14))
+    res.grid(row=9, column=2, columnspan=4, sticky="n")
+    Label(inicio, text="Pesos (kg)",
+          font=("Unicode", 14,
+                "roman")).grid(row=4, column=6, columnspan=2)
+    ganado = Frame(inicio)
+    barra_dos = Scrollbar(ganado)
+    vacas = Listbox(ganado, height=12,
+                    yscrollcommand=barra_dos.set)
+    barra_dos.config(command=vacas.yview)
+    barra_dos.pack(side="right", expand=True, fill="y")
+    vacas.pack(side="left", expand=True, fill="both")
+    ganado.grid(row=5, column=6, rowspan=5, columnspan=2)
+    guardar = BooleanVar(inicio, value=False)
+    Checkbutton(inicio, text="Guardar pesos en archivo", variable=guardar,
+                font=("Arial", 12, "italic")).grid(row=10, column=6,
+                                                   columnspan=2)
+    calcular = Button(inicio, text="Calcular", background="#eeeeee",
+                      foreground="#000000", font=("Unicode", 14, "roman"),
+                      command=partial(calculo, inicio, lista, e1, c1, e2,
+                                      c2, e3, c3, e4, c4, e5, c5, e6, c6,
+                                      e7, c7, res, conf, vacas, memoria,
+                                      guardar))
+    calcular.grid(row=8, column=3, columnspan=3)
+    inicio.mainloop()